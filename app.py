@@ -1,12 +1,20 @@
 from flask import Flask, request, jsonify, send_from_directory
-from flask_sqlalchemy import SQLAlchemy
 from flask_bcrypt import Bcrypt
 from flask_jwt_extended import (
     JWTManager, create_access_token,
-    jwt_required, get_jwt_identity
+    jwt_required, get_jwt_identity, verify_jwt_in_request
 )
 from flask_cors import CORS
+from sqlalchemy import inspect
+from flask_jwt_extended.exceptions import JWTExtendedException
+from jwt.exceptions import PyJWTError
+from models import db, User, DiseaseCount, rebuild_history_aggregates
+from history_routes import history_bp
 import os
+import time
+import uuid
+import threading
+from collections import OrderedDict
 import joblib
 import numpy as np
 
@@ -53,20 +61,23 @@ if is_production:
     app.config['JSON_SORT_KEYS'] = False
 
 # === Extensions ===
-db = SQLAlchemy(app)
+db.init_app(app)
 bcrypt = Bcrypt(app)
 jwt = JWTManager(app)
 
-# === User Model ===
-class User(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    username = db.Column(db.String(80), unique=True, nullable=False)
-    password = db.Column(db.String(128), nullable=False)
+# === Blueprints ===
+app.register_blueprint(history_bp)
 
 # === Initialize DB ===
 try:
     with app.app_context():
+        aggregates_exist = inspect(db.engine).has_table(DiseaseCount.__tablename__)
         db.create_all()
+        if not aggregates_exist:
+            # One-time backfill of the dashboard counters from existing History rows
+            rebuild_history_aggregates()
+            db.session.commit()
+            print("History aggregates rebuilt from existing history")
         if is_production:
             print("Database tables created successfully in production")
         else:
@@ -153,6 +164,72 @@ except Exception as e:
         print("Model loading failed in production environment")
     raise RuntimeError(error_msg)
 
+# === Chat Session Store ===
+# Multi-turn conversations for predict_v3. Each session keeps the symptom
+# phrases seen so far and the matching binary feature vector, so a new
+# message only has to match its own phrases against symptoms_list.
+CHAT_SESSION_MAX = int(os.environ.get("CHAT_SESSION_MAX", 1000))
+CHAT_SESSION_IDLE_SECONDS = int(os.environ.get("CHAT_SESSION_IDLE_SECONDS", 1800))
+# Bounds the memory held (and echoed back) per session, not just the session count
+CHAT_SESSION_MAX_SYMPTOMS = int(os.environ.get("CHAT_SESSION_MAX_SYMPTOMS", 50))
+CHAT_SYMPTOM_MAX_LENGTH = 100
+
+chat_sessions = OrderedDict()  # session_id -> session dict, least recently used first
+chat_sessions_lock = threading.Lock()
+
+def _evict_chat_sessions(now):
+    # Sessions are kept in last-used order, so idle ones are always at the front
+    while chat_sessions:
+        oldest_id, oldest = next(iter(chat_sessions.items()))
+        if now - oldest["last_seen"] < CHAT_SESSION_IDLE_SECONDS and len(chat_sessions) <= CHAT_SESSION_MAX:
+            break
+        chat_sessions.pop(oldest_id)
+
+def get_chat_session(session_id, owner):
+    """
+    Return the live session for session_id, or None if it is unknown, expired
+    or belongs to a different user (owner is the JWT identity, None if anonymous)
+    """
+    now = time.time()
+    with chat_sessions_lock:
+        _evict_chat_sessions(now)
+        session = chat_sessions.get(session_id)
+        if session is None or session["owner"] != owner:
+            return None
+        session["last_seen"] = now
+        chat_sessions.move_to_end(session_id)
+        return session
+
+def create_chat_session(owner):
+    now = time.time()
+    session = {
+        "id": uuid.uuid4().hex,
+        "owner": owner,
+        # Held for a whole turn so concurrent turns on one session don't interleave
+        "lock": threading.Lock(),
+        "symptoms": [],
+        "vector": np.zeros(len(symptoms_list), dtype=np.int8),
+        "disease": None,
+        "last_seen": now,
+    }
+    with chat_sessions_lock:
+        chat_sessions[session["id"]] = session
+        _evict_chat_sessions(now)
+    return session
+
+def match_symptom_indices(input_symptoms):
+    """
+    Return indices into symptoms_list matched by any of the user's symptom phrases
+    """
+    matched = []
+    for index, symptom in enumerate(symptoms_list):
+        # Check if any user symptom matches or is contained in the model symptom
+        for user_symptom in input_symptoms:
+            if user_symptom in symptom or symptom in user_symptom:
+                matched.append(index)
+                break
+    return matched
+
 # === Medical Validation Function ===
 def apply_medical_validation(input_symptoms, predicted_disease):
     """
@@ -310,9 +387,38 @@ def apply_medical_validation(input_symptoms, predicted_disease):
     # If no override needed, return original prediction
     return predicted_disease
 
+# === Prediction ===
+def predict_disease(input_symptoms, input_vector):
+    matched_symptoms = [symptoms_list[i] for i in np.flatnonzero(input_vector)]
+    print(f"Matched symptoms: {matched_symptoms}")
+    print(f"Input vector sum: {int(input_vector.sum())} out of {len(input_vector)}")
+
+    input_array = np.array([input_vector])
+    prediction_index = model.predict(input_array)[0]
+    predicted_disease = label_encoder.inverse_transform([prediction_index])[0]
+
+    print(f"Predicted disease: {predicted_disease}")
+
+    # Medical validation - Override incorrect predictions for common symptoms
+    return apply_medical_validation(input_symptoms, predicted_disease)
+
+# === Optional Login ===
+def optional_jwt_identity():
+    """
+    JWT identity of the caller, or None if no token was sent or it is
+    expired or unreadable (predict_v3 must keep working for those users)
+    """
+    try:
+        verify_jwt_in_request(optional=True)
+        return get_jwt_identity()
+    except (JWTExtendedException, PyJWTError):
+        return None
+
 # === New Prediction Route - Version 3.0 ===
 @app.route("/api/predict_v3", methods=["POST"])
 def predict_v3():
+    user_id = optional_jwt_identity()
+
     try:
         print("=== NEW PREDICTION API v3.0 CALLED ===")
         data = request.get_json(force=True)
@@ -340,31 +446,51 @@ def predict_v3():
         print(f"Processed symptoms: {input_symptoms}")
         print(f"Available symptoms in model: {symptoms_list[:10]}...")  # Show first 10
         
-        # Convert symptoms to binary vector with better matching
-        input_vector = []
-        matched_symptoms = []
-        
-        for symptom in symptoms_list:
-            # Check if any user symptom matches or is contained in the model symptom
-            match_found = False
-            for user_symptom in input_symptoms:
-                if user_symptom in symptom or symptom in user_symptom:
-                    match_found = True
-                    matched_symptoms.append(symptom)
-                    break
-            input_vector.append(1 if match_found else 0)
-        
-        print(f"Matched symptoms: {matched_symptoms}")
-        print(f"Input vector sum: {sum(input_vector)} out of {len(input_vector)}")
-        
-        input_array = np.array([input_vector])
-        prediction_index = model.predict(input_array)[0]
-        predicted_disease = label_encoder.inverse_transform([prediction_index])[0]
-        
-        print(f"Predicted disease: {predicted_disease}")
-        
-        # Medical validation - Override incorrect predictions for common symptoms
-        predicted_disease = apply_medical_validation(input_symptoms, predicted_disease)
+        # Multi-turn conversation: only the newly added phrases are matched and
+        # folded into the session's vector. Clients opt in by sending
+        # "session_id" (null to start a new conversation). Sessions never write
+        # History; saving a diagnosis is left to POST /api/history.
+        # If the session_id is unknown, expired or owned by another user, a new
+        # session is started with only this message's phrases and the response
+        # sets "session_reset" so the client can tell the user or resend.
+        # Note: frontend/build still holds the old stateless client until
+        # build.sh is run again; it never sends session_id.
+        session = None
+        session_reset = False
+        if data and "session_id" in data:
+            session_id = data.get("session_id")
+            session = get_chat_session(session_id, user_id) if session_id else None
+            if session is None:
+                session_reset = session_id is not None
+                session = create_chat_session(user_id)
+
+        if session is not None:
+            with session["lock"]:
+                new_symptoms = []
+                for sym in input_symptoms:
+                    if sym and sym not in session["symptoms"] and sym not in new_symptoms:
+                        new_symptoms.append(sym)
+                if any(len(sym) > CHAT_SYMPTOM_MAX_LENGTH for sym in new_symptoms):
+                    return jsonify({"msg": f"V3: Each symptom must be at most {CHAT_SYMPTOM_MAX_LENGTH} characters"}), 422
+                if len(session["symptoms"]) + len(new_symptoms) > CHAT_SESSION_MAX_SYMPTOMS:
+                    return jsonify({"msg": f"V3: A conversation can hold at most {CHAT_SESSION_MAX_SYMPTOMS} symptoms, please start a new chat"}), 422
+
+                new_indices = match_symptom_indices(new_symptoms)
+                print(f"Session {session['id']}: new symptoms {new_symptoms}, {len(new_indices)} new matches")
+                input_symptoms = session["symptoms"] + new_symptoms
+                input_vector = session["vector"].copy()
+                input_vector[new_indices] = 1
+
+                predicted_disease = predict_disease(input_symptoms, input_vector)
+
+                # Only commit the turn to the session once prediction succeeded
+                previous_disease = session["disease"]
+                session.update(symptoms=input_symptoms, vector=input_vector, disease=predicted_disease)
+        else:
+            # Convert symptoms to binary vector with better matching
+            input_vector = np.zeros(len(symptoms_list), dtype=np.int8)
+            input_vector[match_symptom_indices(input_symptoms)] = 1
+            predicted_disease = predict_disease(input_symptoms, input_vector)
 
         medicine_mapping = {
             # Respiratory Conditions
@@ -429,11 +555,22 @@ def predict_v3():
 
         medicines = medicine_mapping.get(predicted_disease.lower(), ["Consult a physician"])
 
-        return jsonify({
+        response = {
             "disease": predicted_disease,
             "medicines": medicines,
             "version": "3.0"
-        })
+        }
+
+        if session is not None:
+            response.update({
+                "session_id": session["id"],
+                "session_reset": session_reset,
+                "symptoms": input_symptoms,
+                "previous_disease": previous_disease,
+                "diagnosis_changed": previous_disease is not None and previous_disease != predicted_disease
+            })
+
+        return jsonify(response)
     
     except Exception as e:
         return jsonify({"msg": f"Error v3.0: {str(e)}"}), 500
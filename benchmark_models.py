@@ -0,0 +1,218 @@
+"""
+Benchmark the candidate serving models on the symptom dataset.
+
+Every candidate is trained on the same train/test split and measured for:
+accuracy, macro-F1, serialized size, resident memory after load, cold-load
+time, single-row latency and batch-1000 latency. Memory and load time are
+measured in a fresh Python process so earlier candidates don't skew them;
+the cost of importing the estimator's sklearn module is reported separately
+(import_rss_bytes, import_seconds) from the cost of loading the model itself.
+
+Usage:
+    python benchmark_models.py DATASET.csv [--nrows N] [--output results.csv]
+                               [--export best|random_forest|bernoulli_nb|...]
+                               [--max-size BYTES] [--max-rss BYTES] [--max-latency-ms MS]
+
+--output writes CSV, or JSON if the path ends in .json (default: CSV on stdout).
+--export refits the chosen model on the full dataset and writes it with
+label_encoder.joblib and symptoms_list.joblib into model/, the files app.py
+loads at startup. "best" picks the highest macro-F1 among the candidates
+within the --max-size / --max-rss / --max-latency-ms (single row) budgets.
+
+Needs pandas in addition to requirements.txt (development only).
+"""
+import argparse
+import csv
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import accuracy_score, f1_score
+from sklearn.model_selection import train_test_split
+from sklearn.naive_bayes import BernoulliNB
+from sklearn.preprocessing import LabelEncoder
+from sklearn.tree import DecisionTreeClassifier
+
+# === Candidates (same settings as Health_analysis.ipynb) ===
+CANDIDATES = {
+    "random_forest": lambda: RandomForestClassifier(n_estimators=10, max_depth=10, random_state=42),
+    "bernoulli_nb": lambda: BernoulliNB(),
+    "logistic_regression": lambda: LogisticRegression(max_iter=1000),
+    "decision_tree": lambda: DecisionTreeClassifier(max_depth=20, random_state=42),
+}
+
+MODEL_DIR = "model"
+MODEL_FILE = "model_compatible.joblib"
+LATENCY_REPEATS = 50
+BATCH_SIZE = 1000
+
+FIELDS = [
+    "model", "accuracy", "macro_f1", "size_bytes", "import_rss_bytes",
+    "import_seconds", "rss_after_load_bytes", "cold_load_seconds",
+    "single_row_ms", "batch_1000_ms",
+]
+
+# Run in a fresh interpreter. The estimator's module (argv[2]) is imported and
+# measured on its own first, so the load figures only cover the model itself.
+LOAD_PROBE = r"""
+import importlib, json, os, sys, time
+import joblib, numpy, sklearn
+
+def rss():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        import resource
+        scale = 1 if sys.platform == "darwin" else 1024
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+before = rss()
+start = time.perf_counter()
+importlib.import_module(sys.argv[2])
+import_seconds = time.perf_counter() - start
+import_rss = rss() - before
+
+before = rss()
+start = time.perf_counter()
+model = joblib.load(sys.argv[1])
+elapsed = time.perf_counter() - start
+print(json.dumps({
+    "import_rss_bytes": import_rss,
+    "import_seconds": import_seconds,
+    "rss_after_load_bytes": rss() - before,
+    "cold_load_seconds": elapsed,
+}))
+"""
+
+def load_dataset(path, nrows=None):
+    df = pd.read_csv(path, nrows=nrows)
+    le = LabelEncoder()
+    y = le.fit_transform(df["diseases"])
+    X = df.drop(columns=["diseases"])
+    return X, y, le
+
+def measure_latency_ms(model, rows):
+    timings = []
+    for _ in range(LATENCY_REPEATS):
+        start = time.perf_counter()
+        model.predict(rows)
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings)) * 1000
+
+def measure_load(path, module):
+    output = subprocess.run(
+        [sys.executable, "-c", LOAD_PROBE, path, module],
+        check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def benchmark(name, model, X_train, X_test, y_train, y_test, workdir):
+    print(f"Training {name}...", file=sys.stderr)
+    model.fit(X_train, y_train)
+    y_pred = model.predict(X_test)
+
+    path = os.path.join(workdir, f"{name}.joblib")
+    joblib.dump(model, path)
+
+    batch = np.resize(X_test, (BATCH_SIZE, X_test.shape[1]))
+    result = {
+        "model": name,
+        "accuracy": accuracy_score(y_test, y_pred),
+        "macro_f1": f1_score(y_test, y_pred, average="macro", zero_division=0),
+        "size_bytes": os.path.getsize(path),
+        "single_row_ms": measure_latency_ms(model, X_test[:1]),
+        "batch_1000_ms": measure_latency_ms(model, batch),
+    }
+    result.update(measure_load(path, type(model).__module__))
+    return result
+
+def write_results(results, output):
+    if output and output.endswith(".json"):
+        with open(output, "w") as f:
+            json.dump([{field: r[field] for field in FIELDS} for r in results], f, indent=2)
+        return
+
+    f = open(output, "w", newline="") if output else sys.stdout
+    try:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerows(results)
+    finally:
+        if output:
+            f.close()
+
+def export_model(model, label_encoder, symptoms_list, model_dir=MODEL_DIR):
+    """
+    Write the artifacts app.py loads from model/
+    """
+    os.makedirs(model_dir, exist_ok=True)
+    joblib.dump(model, os.path.join(model_dir, MODEL_FILE))
+    joblib.dump(label_encoder, os.path.join(model_dir, "label_encoder.joblib"))
+    joblib.dump(symptoms_list, os.path.join(model_dir, "symptoms_list.joblib"))
+
+def pick_best(results, max_size=None, max_rss=None, max_latency_ms=None):
+    """
+    Highest macro-F1 among the candidates that fit every given budget
+    """
+    fits = [
+        r for r in results
+        if (max_size is None or r["size_bytes"] <= max_size)
+        and (max_rss is None or r["rss_after_load_bytes"] <= max_rss)
+        and (max_latency_ms is None or r["single_row_ms"] <= max_latency_ms)
+    ]
+    if not fits:
+        return None
+    return max(fits, key=lambda r: r["macro_f1"])["model"]
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark candidate disease prediction models")
+    parser.add_argument("dataset", help="CSV with a 'diseases' column and one 0/1 column per symptom")
+    parser.add_argument("--nrows", type=int, help="Only read the first N rows of the dataset")
+    parser.add_argument("--test-size", type=float, default=0.2)
+    parser.add_argument("--output", help="Write results to this file (.json for JSON, otherwise CSV)")
+    parser.add_argument("--export", choices=["best"] + list(CANDIDATES),
+                        help="Refit this model on the full dataset and export it to model/ "
+                             "('best': highest macro-F1 within the budgets below)")
+    parser.add_argument("--max-size", type=int, help="Budget for --export best: serialized size in bytes")
+    parser.add_argument("--max-rss", type=int, help="Budget for --export best: RSS after load in bytes")
+    parser.add_argument("--max-latency-ms", type=float, help="Budget for --export best: single-row latency in ms")
+    args = parser.parse_args()
+
+    X, y, label_encoder = load_dataset(args.dataset, args.nrows)
+    symptoms_list = X.columns.tolist()
+    X_train, X_test, y_train, y_test = train_test_split(
+        X.to_numpy(), y, test_size=args.test_size, random_state=42
+    )
+
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for name, factory in CANDIDATES.items():
+            results.append(benchmark(name, factory(), X_train, X_test, y_train, y_test, workdir))
+
+    write_results(results, args.output)
+
+    if args.export:
+        name = args.export
+        if name == "best":
+            name = pick_best(results, args.max_size, args.max_rss, args.max_latency_ms)
+            if name is None:
+                sys.exit("No candidate fits the given budgets, nothing exported")
+
+        # The benchmark scored a model trained on the split; serve one trained on everything
+        print(f"Refitting {name} on the full dataset...", file=sys.stderr)
+        model = CANDIDATES[name]()
+        model.fit(X.to_numpy(), y)
+        export_model(model, label_encoder, symptoms_list)
+        print(f"Exported {name} to {MODEL_DIR}/", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,6 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from models import db, History
+from models import db, add_history
 import os
 import joblib
 
@@ -49,8 +49,7 @@ def predict():
 
     # Save to history
     user_id = get_jwt_identity()
-    new_entry = History(user_id=user_id, symptoms=symptoms, prediction=disease)
-    db.session.add(new_entry)
+    add_history(user_id, symptoms, disease)
     db.session.commit()
 
     # Medicine result
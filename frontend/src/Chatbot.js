@@ -18,6 +18,8 @@ export default function Chatbot() {
   const [chat, setChat] = useState([]);
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState("");
+  // Server-side conversation: after the first message only new symptoms are sent
+  const [sessionId, setSessionId] = useState(null);
 
   const baseURL =
     process.env.NODE_ENV === "production"
@@ -38,19 +40,20 @@ export default function Chatbot() {
           "Content-Type": "application/json",
           "Authorization": `Bearer ${auth.token}`,
         },
-        body: JSON.stringify({ symptoms: message.trim() })
+        body: JSON.stringify({ symptoms: message.trim(), session_id: sessionId })
       });
 
       const data = await res.json();
 
       if (res.ok) {
-        setChat((prev) => [
-          ...prev,
-          {
-            sender: "bot",
-            text: `Disease: ${data.disease}\nMedicines: ${data.medicines.join(", ")}`,
-          },
-        ]);
+        setSessionId(data.session_id);
+        let text = `Disease: ${data.disease}\nMedicines: ${data.medicines.join(", ")}`;
+        if (data.session_reset) {
+          text = `Previous conversation expired, starting over.\n${text}`;
+        } else if (data.diagnosis_changed) {
+          text += `\nChanged from: ${data.previous_disease}`;
+        }
+        setChat((prev) => [...prev, { sender: "bot", text }]);
       } else {
         setError(data.msg || "Prediction failed");
         setChat((prev) => [
@@ -83,7 +86,20 @@ export default function Chatbot() {
             Welcome, <span className="username">{auth.user?.username}</span>
           </Typography>
         </Box>
-        <Button variant="outlined" onClick={logout}>Logout</Button>
+        <Box display="flex" gap={1}>
+          <Button
+            variant="outlined"
+            onClick={() => {
+              setSessionId(null);
+              setChat([]);
+              setError("");
+            }}
+            disabled={loading}
+          >
+            New Chat
+          </Button>
+          <Button variant="outlined" onClick={logout}>Logout</Button>
+        </Box>
       </Box>
 
       <Paper sx={{ p: 2, minHeight: 300, maxHeight: 400, overflowY: "auto", mb: 2 }}>
@@ -1,7 +1,10 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from models import db, History, User
-from datetime import datetime
+from models import (
+    db, History, User, add_history,
+    DiseaseCount, DailyDiseaseCount, UserDiseaseCount, UserDailyDiseaseCount
+)
+from datetime import datetime, timedelta
 
 history_bp = Blueprint("history", __name__)
 
@@ -16,8 +19,7 @@ def save_history():
     if not symptoms or not prediction:
         return jsonify({"msg": "Missing data"}), 400
 
-    new_entry = History(user_id=user_id, symptoms=symptoms, prediction=prediction)
-    db.session.add(new_entry)
+    add_history(user_id, symptoms, prediction)
     db.session.commit()
 
     return jsonify({"msg": "History saved"}), 201
@@ -36,3 +38,37 @@ def get_history():
         } for h in history
     ]
     return jsonify(output), 200
+
+# === Dashboard Summary (served from the aggregate tables, not History) ===
+@history_bp.route("/api/history/summary", methods=["GET"])
+@jwt_required()
+def get_history_summary():
+    user_id = get_jwt_identity()
+    days = min(max(request.args.get("days", 30, type=int), 1), 365)
+    since = datetime.utcnow().date() - timedelta(days=days - 1)
+
+    def by_disease(rows):
+        return {r.prediction: r.count for r in rows}
+
+    def by_day(rows):
+        output = {}
+        for r in rows:
+            output.setdefault(r.day.isoformat(), {})[r.prediction] = r.count
+        return output
+
+    return jsonify({
+        "days": days,
+        "global": {
+            "by_disease": by_disease(DiseaseCount.query.all()),
+            "by_day": by_day(DailyDiseaseCount.query.filter(DailyDiseaseCount.day >= since).all()),
+        },
+        "user": {
+            "by_disease": by_disease(UserDiseaseCount.query.filter_by(user_id=user_id).all()),
+            "by_day": by_day(
+                UserDailyDiseaseCount.query
+                .filter_by(user_id=user_id)
+                .filter(UserDailyDiseaseCount.day >= since)
+                .all()
+            ),
+        },
+    }), 200
@@ -1,4 +1,8 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from datetime import datetime
 db = SQLAlchemy()
 
 class User(db.Model):
@@ -13,4 +17,73 @@ class History(db.Model):
     prediction = db.Column(db.String(100), nullable=False)
     timestamp = db.Column(db.DateTime, server_default=db.func.now())
 
-    user = db.relationship("User", backref="history")
\ No newline at end of file
+    user = db.relationship("User", backref="history")
+
+# === History Aggregates (kept in sync on every History insert) ===
+class DiseaseCount(db.Model):
+    prediction = db.Column(db.String(100), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+class DailyDiseaseCount(db.Model):
+    day = db.Column(db.Date, primary_key=True)
+    prediction = db.Column(db.String(100), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+class UserDiseaseCount(db.Model):
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id"), primary_key=True)
+    prediction = db.Column(db.String(100), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+class UserDailyDiseaseCount(db.Model):
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id"), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    prediction = db.Column(db.String(100), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+UPSERT_DIALECTS = {"sqlite": sqlite_insert, "postgresql": postgresql_insert}
+
+def _bump(model, **key):
+    # Increment in SQL (never read-modify-write) so concurrent inserts for the
+    # same key can neither lose an update nor collide on the first INSERT
+    table = model.__table__
+    dialect = db.session.get_bind().dialect.name
+    if dialect not in UPSERT_DIALECTS:
+        raise RuntimeError(f"History aggregates need SQLite or PostgreSQL, not '{dialect}'")
+
+    stmt = UPSERT_DIALECTS[dialect](table).values(count=1, **key).on_conflict_do_update(
+        index_elements=list(key), set_={"count": table.c.count + 1}
+    )
+    db.session.execute(stmt)
+
+def add_history(user_id, symptoms, prediction):
+    """
+    Add a History row and update the aggregate tables in the same session.
+    The caller is responsible for committing.
+    """
+    now = datetime.utcnow()
+    entry = History(user_id=user_id, symptoms=symptoms, prediction=prediction, timestamp=now)
+    db.session.add(entry)
+
+    _bump(DiseaseCount, prediction=prediction)
+    _bump(DailyDiseaseCount, day=now.date(), prediction=prediction)
+    _bump(UserDiseaseCount, user_id=user_id, prediction=prediction)
+    _bump(UserDailyDiseaseCount, user_id=user_id, day=now.date(), prediction=prediction)
+    return entry
+
+def rebuild_history_aggregates():
+    """
+    Recompute the aggregate tables from History with GROUP BY.
+    Needed once for databases that already had History rows before the
+    aggregate tables existed. The caller is responsible for committing.
+    """
+    day = func.date(History.timestamp)
+    aggregates = [
+        (DiseaseCount, ["prediction"], [History.prediction]),
+        (DailyDiseaseCount, ["day", "prediction"], [day, History.prediction]),
+        (UserDiseaseCount, ["user_id", "prediction"], [History.user_id, History.prediction]),
+        (UserDailyDiseaseCount, ["user_id", "day", "prediction"], [History.user_id, day, History.prediction]),
+    ]
+    for model, columns, group_by in aggregates:
+        db.session.query(model).delete()
+        query = select(*group_by, func.count()).group_by(*group_by)
+        db.session.execute(model.__table__.insert().from_select(columns + ["count"], query))